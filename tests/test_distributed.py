@@ -0,0 +1,151 @@
+import pytest
+
+from tictactoe_distributed import GameCoordinator
+
+
+def ties(games):
+    return {'wins': 0, 'losses': 0, 'ties': games}
+
+
+def expire(coordinator, lease_id):
+    """Make a lease look like its worker went quiet long ago."""
+    coordinator.leases[lease_id]['last_seen'] -= coordinator.lease_timeout + 1
+
+
+def make_straggler(coordinator, lease_id, per_game=0.01):
+    """Make a lease look far slower than the leases finished so far."""
+    coordinator.lease_durations.append(per_game)
+    coordinator.leases[lease_id]['issued_at'] -= 100
+
+
+def test_splits_games_into_tasks():
+    coordinator = GameCoordinator(12, games_per_task=5)
+    assert [task['games'] for task in coordinator.tasks.values()] == [5, 5, 2]
+
+
+@pytest.mark.parametrize("games_per_task", [0, -1])
+def test_rejects_games_per_task_below_one(games_per_task):
+    with pytest.raises(ValueError):
+        GameCoordinator(10, games_per_task=games_per_task)
+
+
+def test_finishes_when_every_task_is_reported():
+    coordinator = GameCoordinator(4, games_per_task=2)
+    for _ in range(2):
+        work = coordinator.request_work('a')
+        assert coordinator.report_result('a', work['lease_id'], ties(2))
+    assert coordinator.is_done()
+    assert coordinator.request_work('a') == {'done': True}
+    assert coordinator.stats == ties(4)
+
+
+def test_reaps_lease_without_heartbeat():
+    coordinator = GameCoordinator(5, games_per_task=5, lease_timeout=10)
+    lease_a = coordinator.request_work('a')
+    task_id = coordinator.leases[lease_a['lease_id']]['task_id']
+    expire(coordinator, lease_a['lease_id'])
+
+    lease_b = coordinator.request_work('b')
+    assert coordinator.leases[lease_b['lease_id']]['task_id'] == task_id
+    assert coordinator.metrics['leases_reassigned'] == 1
+
+    # The quiet worker learns it lost the lease and its late report is ignored
+    assert not coordinator.heartbeat('a', lease_a['lease_id'])
+    assert not coordinator.report_result('a', lease_a['lease_id'], ties(5))
+    assert coordinator.report_result('b', lease_b['lease_id'], ties(5))
+    assert coordinator.stats == ties(5)
+
+
+def test_heartbeat_keeps_lease_alive():
+    coordinator = GameCoordinator(10, games_per_task=5, lease_timeout=10)
+    lease = coordinator.request_work('a')
+    expire(coordinator, lease['lease_id'])
+    assert coordinator.heartbeat('a', lease['lease_id'])
+
+    coordinator.request_work('b')
+    assert lease['lease_id'] in coordinator.leases
+    assert coordinator.metrics['leases_reassigned'] == 0
+
+
+def test_requeues_shortfall_at_front_of_queue():
+    coordinator = GameCoordinator(10, games_per_task=5)
+    work = coordinator.request_work('a')
+    assert coordinator.report_result('a', work['lease_id'], ties(3))
+
+    assert coordinator.metrics['games_requeued'] == 2
+    assert coordinator.request_work('a')['games'] == 2
+    assert not coordinator.is_done()
+
+
+def test_retires_worker_after_leases_without_games():
+    coordinator = GameCoordinator(15, games_per_task=5, max_failed_leases=3)
+    for _ in range(3):
+        work = coordinator.request_work('broken')
+        coordinator.report_result('broken', work['lease_id'], ties(0))
+
+    assert coordinator.workers['broken']['retired']
+    assert coordinator.metrics['workers_retired'] == 1
+    assert coordinator.request_work('broken') == {'done': True, 'retired': True}
+
+    # Nothing was lost: a healthy worker still gets all 15 games
+    while not coordinator.is_done():
+        work = coordinator.request_work('healthy')
+        coordinator.report_result('healthy', work['lease_id'], ties(work['games']))
+    assert coordinator.stats == ties(15)
+
+
+def test_played_games_reset_failed_leases():
+    coordinator = GameCoordinator(20, games_per_task=5, max_failed_leases=2)
+    for games in (0, 5, 0):
+        work = coordinator.request_work('flaky')
+        coordinator.report_result('flaky', work['lease_id'], ties(games))
+    assert not coordinator.workers['flaky']['retired']
+
+
+def test_idle_worker_gets_backup_of_straggler():
+    coordinator = GameCoordinator(5, games_per_task=5)
+    lease_a = coordinator.request_work('a')
+    assert coordinator.request_work('b') == {}
+
+    make_straggler(coordinator, lease_a['lease_id'])
+    lease_b = coordinator.request_work('b')
+    assert lease_b['games'] == 5
+    assert coordinator.metrics['backups_issued'] == 1
+
+    # First full report wins, the other copy is a duplicate
+    assert coordinator.report_result('b', lease_b['lease_id'], ties(5))
+    assert not coordinator.heartbeat('a', lease_a['lease_id'])
+    assert not coordinator.report_result('a', lease_a['lease_id'], ties(5))
+    assert coordinator.metrics['duplicate_reports'] == 1
+    assert coordinator.stats == ties(5)
+
+
+def test_short_backup_report_does_not_close_running_task():
+    coordinator = GameCoordinator(5, games_per_task=5)
+    lease_a = coordinator.request_work('a')
+    make_straggler(coordinator, lease_a['lease_id'])
+    lease_b = coordinator.request_work('broken')
+
+    assert not coordinator.report_result('broken', lease_b['lease_id'], ties(0))
+    assert coordinator.metrics['short_reports_dropped'] == 1
+    assert coordinator.workers['broken']['failed_leases'] == 1
+    assert not coordinator.is_done()
+
+    # The original lease carries on and its result is the one counted
+    assert coordinator.heartbeat('a', lease_a['lease_id'])
+    assert coordinator.report_result('a', lease_a['lease_id'], ties(5))
+    assert coordinator.is_done()
+    assert coordinator.stats == ties(5)
+    assert coordinator.metrics['games_requeued'] == 0
+
+
+def test_short_original_report_waits_for_running_backup():
+    coordinator = GameCoordinator(5, games_per_task=5)
+    lease_a = coordinator.request_work('a')
+    make_straggler(coordinator, lease_a['lease_id'])
+    lease_b = coordinator.request_work('b')
+
+    assert not coordinator.report_result('a', lease_a['lease_id'], ties(4))
+    assert coordinator.report_result('b', lease_b['lease_id'], ties(5))
+    assert coordinator.stats == ties(5)
+    assert coordinator.metrics['games_requeued'] == 0
@@ -7,28 +7,101 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.action_chains import ActionChains
+from tictactoe_profiler import SessionProfiler
+import tictactoe_engine as engine
+import argparse
+import contextlib
+import heapq
 import time
 import os
 import sys
 
+GAME_URL = "https://playtictactoe.org/"
+
+def _process_memory_kb(pid):
+    """Proportional set size of a process in kB, falling back to RSS."""
+    for path, field in ((f"/proc/{pid}/smaps_rollup", "Pss:"), (f"/proc/{pid}/status", "VmRSS:")):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1])
+        except (OSError, ValueError):
+            continue
+    return 0
+
+def browser_memory_mb(driver):
+    """Memory used by the local browser's process tree in MB, or None if unknown.
+    
+    Walks /proc from the ChromeDriver process, so it only works for a local
+    driver on Linux. PSS is used where available so pages shared between
+    Chrome's processes are not counted several times.
+    """
+    try:
+        root_pid = driver.service.process.pid
+    except AttributeError:
+        return None  # Remote driver, or nothing we started ourselves
+    if not os.path.isdir("/proc"):
+        return None
+    
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+            parent_pid = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(parent_pid, []).append(int(entry))
+    
+    total_kb = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        total_kb += _process_memory_kb(pid)
+        pending.extend(children.get(pid, []))
+    return total_kb / 1024
+
+def print_throughput(games, elapsed, driver):
+    """Print games per minute and, when the browser's memory is known, per GB of it."""
+    if elapsed <= 0:
+        return
+    per_minute = games * 60 / elapsed
+    print(f"Throughput: {per_minute:.1f} games per minute")
+    memory_mb = browser_memory_mb(driver)
+    if memory_mb:
+        print(f"Browser memory: {memory_mb:.0f} MB ({per_minute * 1024 / memory_mb:.1f} games per minute per GB)")
+
 class TicTacToeBot:
-    def __init__(self):
+    def __init__(self, driver=None, remote_url=None, game_url=GAME_URL):
         try:
-            print("Setting up Chrome options...")
-            chrome_options = Options()
-            chrome_options.add_argument("--start-maximized")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")  # Disable GPU hardware acceleration
-            chrome_options.add_argument("--disable-software-rasterizer")  # Disable software rasterizer
-            chrome_options.add_experimental_option("detach", True)  # Keep browser open
-            
-            print("Installing ChromeDriver...")
-            service = Service()
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            if driver is None:
+                print("Setting up Chrome options...")
+                chrome_options = Options()
+                chrome_options.add_argument("--start-maximized")
+                chrome_options.add_argument("--no-sandbox")
+                chrome_options.add_argument("--disable-dev-shm-usage")
+                chrome_options.add_argument("--disable-gpu")  # Disable GPU hardware acceleration
+                chrome_options.add_argument("--disable-software-rasterizer")  # Disable software rasterizer
+                chrome_options.add_experimental_option("detach", True)  # Keep browser open
+                
+                if remote_url:
+                    # Use an already running WebDriver endpoint (chromedriver or a grid)
+                    print(f"Connecting to remote WebDriver at {remote_url}...")
+                    self.driver = webdriver.Remote(command_executor=remote_url, options=chrome_options)
+                else:
+                    print("Installing ChromeDriver...")
+                    service = Service()
+                    self.driver = webdriver.Chrome(service=service, options=chrome_options)
+                print("ChromeDriver initialized successfully!")
+            else:
+                # Share an existing browser (e.g. one tab of a MultiTabRunner)
+                self.driver = driver
             self.actions = ActionChains(self.driver)
             
-            print("ChromeDriver initialized successfully!")
+            self.game_url = game_url
             self.board = [['' for _ in range(3)] for _ in range(3)]
             self.wait = WebDriverWait(self.driver, 5)  # Reduced wait time from 10 to 5 seconds
             self.is_x_player = True
@@ -43,6 +116,15 @@ class TicTacToeBot:
             print("3. If the error persists, try manually installing ChromeDriver")
             sys.exit(1)
         
+    def _run_steps(self, steps):
+        """Run a step generator, sleeping through its waits, and return its result."""
+        while True:
+            try:
+                delay = next(steps)
+            except StopIteration as stop:
+                return stop.value
+            time.sleep(delay)
+        
     def wait_for_element(self, by, value, timeout=10):
         """Wait for an element to be present and visible."""
         try:
@@ -56,10 +138,14 @@ class TicTacToeBot:
         
     def start_game(self):
         """Navigate to the Tic-tac-toe game."""
+        return self._run_steps(self.start_game_steps())
+
+    def start_game_steps(self):
+        """Navigate to the game, yielding seconds to wait. Returns True on success."""
         try:
             print("Navigating to the game...")
-            self.driver.get("https://playtictactoe.org/")
-            time.sleep(1)  # Reduced from 3 to 1 second
+            self.driver.get(self.game_url)
+            yield 1  # Reduced from 3 to 1 second
             
             print("Waiting for game board...")
             # First try to find any clickable cell
@@ -80,6 +166,8 @@ class TicTacToeBot:
             
             if len(cells) == 9:
                 print("Making first move in the center...")
+                # Opening the game makes us X, whatever side we played last time
+                self.is_x_player = True
                 # Try to click the center cell
                 center_cell = cells[4]
                 try:
@@ -93,7 +181,7 @@ class TicTacToeBot:
                         # Try moving to element and clicking
                         self.actions.move_to_element(center_cell).click().perform()
                 
-                time.sleep(0.3)  # Reduced from 1 to 0.3 seconds
+                yield 0.3  # Reduced from 1 to 0.3 seconds
                 print("First move made!")
                 
                 # Get initial board state
@@ -189,6 +277,10 @@ class TicTacToeBot:
         
     def make_move(self, row, col):
         """Make a move at the specified position."""
+        return self._run_steps(self.make_move_steps(row, col))
+
+    def make_move_steps(self, row, col):
+        """Make a move, yielding seconds to wait. Returns True if the move was verified."""
         try:
             print(f"Attempting move at ({row}, {col})")
             
@@ -211,7 +303,7 @@ class TicTacToeBot:
             try:
                 inner_div = cell.find_element(By.CSS_SELECTOR, "div")
                 marker_class = inner_div.get_attribute("class").strip().lower()
-            except:
+            except Exception:
                 marker_class = ""
             
             print(f"Cell state before click - Marker class: {marker_class}")
@@ -222,39 +314,39 @@ class TicTacToeBot:
                     try:
                         # Scroll cell into view
                         self.driver.execute_script("arguments[0].scrollIntoView(true);", cell)
-                        time.sleep(0.5)
+                        yield 0.5
                         
                         # Method 1: Click the cell itself
                         cell.click()
                         print("Click attempt 1 (Regular) succeeded")
                         break
-                    except:
+                    except Exception:
                         try:
                             # Method 2: Click the inner div
                             inner_div = cell.find_element(By.CSS_SELECTOR, "div")
                             inner_div.click()
                             print("Click attempt 2 (Inner div) succeeded")
                             break
-                        except:
+                        except Exception:
                             try:
                                 # Method 3: JavaScript click
                                 self.driver.execute_script("arguments[0].click();", cell)
                                 print("Click attempt 3 (JavaScript) succeeded")
                                 break
-                            except:
+                            except Exception:
                                 if attempt == 2:  # Last attempt failed
                                     raise Exception("All click methods failed")
                                 print(f"Click attempt {attempt + 1} failed, retrying...")
-                                time.sleep(1)  # Wait longer before next attempt
+                                yield 1  # Wait longer before next attempt
                 
                 # Wait for move to register
-                time.sleep(1)
+                yield 1
                 
                 # Verify the move was made
                 try:
                     inner_div = cell.find_element(By.CSS_SELECTOR, "div")
                     new_marker_class = inner_div.get_attribute("class").strip().lower()
-                except:
+                except Exception:
                     new_marker_class = ""
                 
                 print(f"Cell state after click - Marker class: {new_marker_class}")
@@ -278,85 +370,26 @@ class TicTacToeBot:
             return False
     
     def calculate_best_move(self):
-        """Calculate the best move using minimax algorithm."""
+        """Calculate the best move for our side using minimax."""
         print("Calculating best move...")
-        best_score = float('-inf')
-        best_move = None
+        player = 'X' if self.is_x_player else 'O'
+        index = engine.best_move(engine.flatten(self.board), player)
         
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == '':
-                    self.board[i][j] = 'X'
-                    score = self.minimax(self.board, 0, False)
-                    self.board[i][j] = ''
-                    if score > best_score:
-                        best_score = score
-                        best_move = (i, j)
-        
-        if best_move:
-            print(f"Best move calculated: {best_move}")
-        else:
-            print("No valid moves found")
-        return best_move
-    
-    def minimax(self, board, depth, is_maximizing):
-        """Minimax algorithm for calculating the best move."""
-        result = self.check_winner()
-        if result is not None:
-            return {'O': -1, 'X': 1, 'tie': 0}[result]
-            
-        if is_maximizing:
-            best_score = float('-inf')
-            for i in range(3):
-                for j in range(3):
-                    if board[i][j] == '':
-                        board[i][j] = 'X'
-                        score = self.minimax(board, depth + 1, False)
-                        board[i][j] = ''
-                        best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = float('inf')
-            for i in range(3):
-                for j in range(3):
-                    if board[i][j] == '':
-                        board[i][j] = 'O'
-                        score = self.minimax(board, depth + 1, True)
-                        board[i][j] = ''
-                        best_score = min(score, best_score)
-            return best_score
+        if index is not None:
+            best_move = (index // 3, index % 3)
+            print(f"Best move calculated for {player}: {best_move}")
+            return best_move
+        print("No valid moves found")
+        return None
     
     def check_winner(self):
         """Check if there's a winner or tie."""
-        # Get current board state
-        board = self.board
-        
-        # Check rows
-        for i in range(3):
-            if board[i][0] == board[i][1] == board[i][2] != '':
-                print(f"Win detected in row {i}")
-                return board[i][0]
-        
-        # Check columns
-        for i in range(3):
-            if board[0][i] == board[1][i] == board[2][i] != '':
-                print(f"Win detected in column {i}")
-                return board[0][i]
-        
-        # Check diagonals
-        if board[0][0] == board[1][1] == board[2][2] != '':
-            print("Win detected in main diagonal")
-            return board[0][0]
-        if board[0][2] == board[1][1] == board[2][0] != '':
-            print("Win detected in other diagonal")
-            return board[0][2]
-        
-        # Check for tie (board full)
-        if all(board[i][j] != '' for i in range(3) for j in range(3)):
+        result = engine.check_winner(engine.flatten(self.board))
+        if result == 'tie':
             print("Game is a tie")
-            return 'tie'
-        
-        return None
+        elif result is not None:
+            print(f"Win detected for {result}")
+        return result
     
     def count_pieces(self, board):
         """Count X and O pieces on the board."""
@@ -429,9 +462,13 @@ class TicTacToeBot:
 
     def start_new_game(self):
         """Start a new game by first clearing the board and then making the first move if we're X."""
+        return self._run_steps(self.start_new_game_steps())
+
+    def start_new_game_steps(self):
+        """Start a new game, yielding seconds to wait. Returns True once the game is under way."""
         try:
             print("\nStarting new game...")
-            time.sleep(1)  # Wait for any animations
+            yield 1  # Wait for any animations
             
             # First check if a new game has already started
             current_state = self.get_board_state()
@@ -460,24 +497,24 @@ class TicTacToeBot:
                         try:
                             # Try JavaScript click first as it's most reliable
                             self.driver.execute_script("arguments[0].click();", restart_button)
-                        except:
+                        except Exception:
                             try:
                                 # Try regular click
                                 restart_button.click()
-                            except:
+                            except Exception:
                                 # Try with action chains
                                 self.actions.move_to_element(restart_button).click().perform()
-                        time.sleep(1)  # Wait for board to clear
+                        yield 1  # Wait for board to clear
                         break
                 except Exception as e:
                     print(f"Restart attempt {attempt + 1} failed: {str(e)}")
                     if attempt < max_restart_attempts - 1:
-                        time.sleep(1)  # Wait before next attempt
+                        yield 1  # Wait before next attempt
                     else:
                         print("Could not click restart button after multiple attempts")
             
             # Verify the board is clear
-            time.sleep(0.5)
+            yield 0.5
             cells = self.driver.find_elements(By.CSS_SELECTOR, "td") or self.driver.find_elements(By.CSS_SELECTOR, "div[class*='square']")
             if len(cells) != 9:
                 print("Error: Could not find game board after clearing")
@@ -502,39 +539,39 @@ class TicTacToeBot:
                     try:
                         # Scroll into view
                         self.driver.execute_script("arguments[0].scrollIntoView(true);", center_cell)
-                        time.sleep(0.5)
+                        yield 0.5
                         
                         # Try clicking the cell
                         center_cell.click()
-                        time.sleep(0.5)  # Wait for move to register
+                        yield 0.5  # Wait for move to register
                         
                         # Verify the move was made
                         inner_div = center_cell.find_element(By.CSS_SELECTOR, "div")
                         marker_class = inner_div.get_attribute("class").strip().lower()
                         if marker_class == 'x':
                             print("First move made in new game!")
-                            time.sleep(0.5)  # Wait for any animations
+                            yield 0.5  # Wait for any animations
                             self.last_board_state = self.get_board_state()
                             return True
-                    except:
+                    except Exception:
                         try:
                             # Try JavaScript click
                             self.driver.execute_script("arguments[0].click();", center_cell)
-                            time.sleep(0.5)
+                            yield 0.5
                             
                             # Verify the move was made
                             inner_div = center_cell.find_element(By.CSS_SELECTOR, "div")
                             marker_class = inner_div.get_attribute("class").strip().lower()
                             if marker_class == 'x':
                                 print("First move made in new game!")
-                                time.sleep(0.5)
+                                yield 0.5
                                 self.last_board_state = self.get_board_state()
                                 return True
-                        except:
+                        except Exception:
                             if attempt == 2:
                                 print("Failed to make first move in new game")
                                 return False
-                            time.sleep(1)
+                            yield 1
                 return False
             elif x_count == 1 and o_count == 0:
                 # X has moved, we're O
@@ -558,6 +595,13 @@ class TicTacToeBot:
 
     def play_multiple_games(self, num_games=5):
         """Play multiple games in succession."""
+        start_time = time.time()
+        games_before = sum(self.stats.values())
+        self._run_steps(self.multiple_games_steps(num_games))
+        print_throughput(sum(self.stats.values()) - games_before, time.time() - start_time, self.driver)
+
+    def multiple_games_steps(self, num_games=5):
+        """Play multiple games, yielding seconds to wait instead of sleeping while idle."""
         games_played = 0
         max_games = num_games
         consecutive_failures = 0
@@ -570,13 +614,13 @@ class TicTacToeBot:
             
             if games_played == 0:
                 # First game starts automatically
-                if not self.start_game():
+                if not (yield from self.start_game_steps()):
                     print("Failed to start first game")
                     consecutive_failures += 1
                     continue
             else:
                 # Subsequent games need to be started manually
-                if not self.start_new_game():
+                if not (yield from self.start_new_game_steps()):
                     print("Failed to start new game")
                     consecutive_failures += 1
                     continue
@@ -585,11 +629,11 @@ class TicTacToeBot:
             consecutive_failures = 0
             
             # Play the game
-            self.play_single_game()
+            yield from self.single_game_steps()
             games_played += 1
             
             print(f"Game {games_played} completed")
-            time.sleep(1)  # Short break between games
+            yield 1  # Short break between games
         
         if consecutive_failures >= max_failures:
             print("\nToo many consecutive failures to start new games. Ending session.")
@@ -598,6 +642,14 @@ class TicTacToeBot:
 
     def play_single_game(self):
         """Play a single game."""
+        self._run_steps(self.single_game_steps())
+
+    def single_game_steps(self):
+        """Play a single game, yielding seconds to wait while the opponent moves.
+        
+        The caller decides how to spend the wait, so a scheduler can drive
+        other games in the meantime.
+        """
         game_active = True
         retry_count = 0
         max_retries = 3
@@ -616,7 +668,7 @@ class TicTacToeBot:
                 if not new_state:
                     print("Error getting board state")
                     retry_count += 1
-                    time.sleep(0.2)  # Reduced from 1 to 0.2
+                    yield 0.2  # Reduced from 1 to 0.2
                     continue
                 
                 # Check if game is over
@@ -671,10 +723,10 @@ class TicTacToeBot:
                     best_move = self.calculate_best_move()
                     if best_move:
                         print(f"Making move at position {best_move}")
-                        if self.make_move(*best_move):
+                        if (yield from self.make_move_steps(*best_move)):
                             moves_made += 1
                             last_move_time = time.time()
-                            time.sleep(0.2)  # Reduced from 0.5 to 0.2
+                            yield 0.2  # Reduced from 0.5 to 0.2
                             self.last_board_state = self.get_board_state()
                             print(f"Move {moves_made} completed")
                             retry_count = 0
@@ -690,9 +742,9 @@ class TicTacToeBot:
                 
                 # Adaptive polling interval - reduced times
                 if time_since_last_move < 1:  # Reduced from 2 to 1
-                    time.sleep(0.1)  # Reduced from 0.2 to 0.1
+                    yield 0.1  # Reduced from 0.2 to 0.1
                 else:
-                    time.sleep(0.2)  # Reduced from 0.5 to 0.2
+                    yield 0.2  # Reduced from 0.5 to 0.2
                 
             except WebDriverException as e:
                 print(f"Browser error in game loop: {str(e)}")
@@ -713,7 +765,7 @@ class TicTacToeBot:
             print("Game ended - no changes detected")
         
         # Wait for any end-game animations
-        time.sleep(0.5)  # Reduced from 2 to 0.5
+        yield 0.5  # Reduced from 2 to 0.5
 
     def close(self):
         """Clean up resources."""
@@ -724,12 +776,114 @@ class TicTacToeBot:
         except:
             pass
 
+class MultiTabRunner:
+    """Play several games at once as tabs of a single Chrome instance.
+    
+    Each tab is driven by its own TicTacToeBot sharing one WebDriver. A single
+    scheduler advances whichever tab is due next and switches window handles
+    before doing so. Every wait in a game (page loads, clicks registering,
+    restarts, the opponent's move) is yielded back to the scheduler, so one
+    tab's WebDriver commands run while the others wait.
+    """
+    def __init__(self, num_tabs=2, remote_url=None, game_url=GAME_URL):
+        first_bot = TicTacToeBot(remote_url=remote_url, game_url=game_url)
+        self.driver = first_bot.driver
+        self.bots = [first_bot]
+        self.handles = [self.driver.current_window_handle]
+        self.current_handle = self.handles[0]
+        
+        for tab in range(1, num_tabs):
+            print(f"Opening tab {tab + 1} of {num_tabs}...")
+            self.driver.switch_to.new_window('tab')
+            self.current_handle = self.driver.current_window_handle
+            self.handles.append(self.current_handle)
+            self.bots.append(TicTacToeBot(driver=self.driver, game_url=game_url))
+    
+    @property
+    def stats(self):
+        """Statistics aggregated over all tabs."""
+        totals = {'wins': 0, 'losses': 0, 'ties': 0}
+        for bot in self.bots:
+            for key in totals:
+                totals[key] += bot.stats[key]
+        return totals
+    
+    def switch_to_tab(self, index):
+        """Make the given tab the target of WebDriver commands."""
+        handle = self.handles[index]
+        if handle != self.current_handle:
+            self.driver.switch_to.window(handle)
+            self.current_handle = handle
+    
+    def play_multiple_games(self, num_games=5):
+        """Play num_games in every tab, interleaving tabs while they wait."""
+        print(f"\nStarting {len(self.bots)} tabs of {num_games} games each...")
+        start_time = time.time()
+        
+        # Heap of (time the tab is due, tab index, its game steps)
+        schedule = [(start_time, index, bot.multiple_games_steps(num_games))
+                    for index, bot in enumerate(self.bots)]
+        heapq.heapify(schedule)
+        
+        while schedule:
+            due_time, index, steps = heapq.heappop(schedule)
+            delay = due_time - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            
+            try:
+                self.switch_to_tab(index)
+                wait = next(steps)
+            except StopIteration:
+                print(f"Tab {index + 1} finished its session")
+                continue
+            except WebDriverException as e:
+                print(f"Browser error in tab {index + 1}, dropping it: {str(e)}")
+                continue
+            
+            heapq.heappush(schedule, (time.time() + wait, index, steps))
+        
+        elapsed = time.time() - start_time
+        stats = self.stats
+        games = stats['wins'] + stats['losses'] + stats['ties']
+        print(f"\nAll tabs finished. Played {games} games in {elapsed:.1f} seconds.")
+        print_throughput(games, elapsed, self.driver)
+    
+    def close(self):
+        """Clean up the shared browser."""
+        try:
+            input("Press Enter to close the browser...")
+            self.driver.quit()
+            print("\nClosed browser successfully")
+        except:
+            pass
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tic-tac-toe bot for playtictactoe.org")
+    parser.add_argument("--games", type=int, default=100, help="Number of games to play (per tab)")
+    parser.add_argument("--tabs", type=int, default=1, help="Number of tabs sharing one Chrome instance")
+    parser.add_argument("--url", default=GAME_URL, help="Game page to play on")
+    parser.add_argument("--remote-url", help="Remote WebDriver endpoint, e.g. http://localhost:9515")
+    parser.add_argument("--profile", metavar="DIR", help="Profile the session and write a report and flamegraph stacks to DIR")
+    parser.add_argument("--profile-mode", choices=["deterministic", "sampling"], default="deterministic",
+                        help="Run under cProfile as well, or only sample stacks (lower overhead)")
+    args = parser.parse_args()
+    
     print("Starting Tic-tac-toe Bot (X/O player)...")
     bot = None
     try:
-        bot = TicTacToeBot()
-        bot.play_multiple_games(100)  # Changed from 5 to 100 games
+        if args.tabs > 1:
+            bot = MultiTabRunner(args.tabs, remote_url=args.remote_url, game_url=args.url)
+        else:
+            bot = TicTacToeBot(remote_url=args.remote_url, game_url=args.url)
+        
+        if args.profile:
+            profiler = SessionProfiler(args.profile, engine_targets=[(TicTacToeBot, 'calculate_best_move')],
+                                       deterministic=args.profile_mode == "deterministic")
+        else:
+            profiler = contextlib.nullcontext()
+        with profiler:
+            bot.play_multiple_games(args.games)
     except KeyboardInterrupt:
         print("\nBot stopped by user")
         if bot:
@@ -0,0 +1,385 @@
+"""Run TicTacToeBot sessions across several machines.
+
+A coordinator splits the total number of games into small tasks and leases
+them to workers over XML-RPC. Workers play each lease with a TicTacToeBot,
+send heartbeats while they play and report their stats when done.
+
+* Leases whose worker stops sending heartbeats are handed to another worker.
+* Games a lease did not play are queued again as a new task, and a worker
+  that reports several leases in a row with no games (e.g. its WebDriver
+  endpoint died) is sent home.
+* Once no unstarted work is left, idle workers get a backup copy of the
+  slowest running lease; whichever copy reports first is counted.
+
+Everything runs on one box for testing, e.g.:
+
+    chromedriver --port=9515 &
+    python tictactoe_distributed.py coordinator --games 20 &
+    python tictactoe_distributed.py worker --remote-url http://localhost:9515 \\
+        --url file://$PWD/local_game.html
+"""
+from xmlrpc.server import SimpleXMLRPCServer
+from collections import deque
+import xmlrpc.client
+import argparse
+import socket
+import statistics
+import threading
+import time
+import os
+
+
+def positive_int(value):
+    """argparse type for integers of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+class GameCoordinator:
+    """Hand out game quotas to workers and collect their results."""
+    def __init__(self, total_games, games_per_task=5, lease_timeout=60, straggler_factor=2.0,
+                 max_failed_leases=3):
+        if games_per_task < 1:
+            raise ValueError(f"games_per_task must be at least 1, got {games_per_task}")
+        self.lease_timeout = lease_timeout
+        self.straggler_factor = straggler_factor
+        self.max_failed_leases = max_failed_leases
+        self.lock = threading.Lock()
+
+        # Tasks are quotas of games; leases are assignments of a task to a worker
+        self.tasks = {}
+        self.pending = deque()
+        remaining = total_games
+        while remaining > 0:
+            games = min(games_per_task, remaining)
+            self._add_task(games)
+            remaining -= games
+
+        self.leases = {}
+        self.next_lease_id = 0
+        self.workers = {}
+        self.stats = {'wins': 0, 'losses': 0, 'ties': 0}
+        self.metrics = {
+            'leases_issued': 0,
+            'leases_reassigned': 0,
+            'backups_issued': 0,
+            'duplicate_reports': 0,
+            'games_requeued': 0,
+            'short_reports_dropped': 0,
+            'workers_retired': 0,
+        }
+        self.lease_durations = []
+        self.start_time = time.time()
+
+    def _add_task(self, games, urgent=False):
+        """Queue a new task of games; urgent tasks go to the front."""
+        task_id = len(self.tasks)
+        self.tasks[task_id] = {'games': games, 'done': False, 'leases': []}
+        if urgent:
+            self.pending.appendleft(task_id)
+        else:
+            self.pending.append(task_id)
+
+    def is_done(self):
+        """Check whether every task has been reported."""
+        with self.lock:
+            return all(task['done'] for task in self.tasks.values())
+
+    def all_workers_retired(self):
+        """Check whether every worker has been retired, leaving nobody to play."""
+        with self.lock:
+            return bool(self.workers) and all(worker['retired'] for worker in self.workers.values())
+
+    def _worker(self, worker_id):
+        """Get (or create) the bookkeeping entry for a worker."""
+        if worker_id not in self.workers:
+            print(f"Worker {worker_id} joined")
+            self.workers[worker_id] = {'games': 0, 'leases': 0, 'busy_time': 0.0, 'last_seen': time.time(),
+                                       'failed_leases': 0, 'retired': False}
+        worker = self.workers[worker_id]
+        worker['last_seen'] = time.time()
+        return worker
+
+    def _reap_expired_leases(self):
+        """Requeue tasks whose worker stopped sending heartbeats."""
+        now = time.time()
+        for lease_id, lease in list(self.leases.items()):
+            if now - lease['last_seen'] <= self.lease_timeout:
+                continue
+            del self.leases[lease_id]
+            task = self.tasks[lease['task_id']]
+            task['leases'].remove(lease_id)
+            if task['done']:
+                continue  # A backup copy already finished it
+            print(f"Lease {lease_id} from worker {lease['worker_id']} timed out")
+            if not task['leases'] and lease['task_id'] not in self.pending:
+                self.pending.appendleft(lease['task_id'])
+                self.metrics['leases_reassigned'] += 1
+
+    def _pick_straggler(self, worker_id):
+        """Pick a running task worth duplicating on an idle worker."""
+        if not self.lease_durations:
+            return None
+        per_game = max(statistics.median(self.lease_durations), 1e-6)
+        now = time.time()
+        slowest = None
+        for lease in self.leases.values():
+            task = self.tasks[lease['task_id']]
+            if task['done'] or len(task['leases']) > 1 or lease['worker_id'] == worker_id:
+                continue  # Finished, already backed up, or it is our own lease
+            overdue = (now - lease['issued_at']) / (per_game * task['games'])
+            if overdue > self.straggler_factor and (slowest is None or overdue > slowest[0]):
+                slowest = (overdue, lease['task_id'])
+        return slowest[1] if slowest else None
+
+    def request_work(self, worker_id):
+        """Lease a task to a worker. Returns {} if nothing is available right now."""
+        with self.lock:
+            worker = self._worker(worker_id)
+            self._reap_expired_leases()
+            if all(task['done'] for task in self.tasks.values()):
+                return {'done': True}
+            if worker['retired']:
+                return {'done': True, 'retired': True}
+
+            if self.pending:
+                task_id = self.pending.popleft()
+            else:
+                task_id = self._pick_straggler(worker_id)
+                if task_id is None:
+                    return {}
+                print(f"Issuing backup of task {task_id} to worker {worker_id}")
+                self.metrics['backups_issued'] += 1
+
+            lease_id = self.next_lease_id
+            self.next_lease_id += 1
+            now = time.time()
+            self.leases[lease_id] = {'task_id': task_id, 'worker_id': worker_id, 'issued_at': now, 'last_seen': now}
+            self.tasks[task_id]['leases'].append(lease_id)
+            self.metrics['leases_issued'] += 1
+            return {'lease_id': lease_id, 'games': self.tasks[task_id]['games']}
+
+    def heartbeat(self, worker_id, lease_id):
+        """Keep a lease alive. Returns False if the worker should abandon it."""
+        with self.lock:
+            self._worker(worker_id)
+            lease = self.leases.get(lease_id)
+            if lease is None or self.tasks[lease['task_id']]['done']:
+                return False
+            lease['last_seen'] = time.time()
+            return True
+
+    def _track_failures(self, worker_id, worker, games):
+        """Retire a worker after too many leases in a row with no games."""
+        if games > 0:
+            worker['failed_leases'] = 0
+            return
+        worker['failed_leases'] += 1
+        if worker['failed_leases'] >= self.max_failed_leases and not worker['retired']:
+            print(f"Worker {worker_id} played no games in {worker['failed_leases']} leases, retiring it")
+            worker['retired'] = True
+            self.metrics['workers_retired'] += 1
+
+    def report_result(self, worker_id, lease_id, stats):
+        """Record the stats of a finished lease. Returns False if it was not counted."""
+        with self.lock:
+            worker = self._worker(worker_id)
+            lease = self.leases.pop(lease_id, None)
+            if lease is None:
+                print(f"Ignoring report for unknown lease {lease_id} from worker {worker_id}")
+                return False
+            task = self.tasks[lease['task_id']]
+            task['leases'].remove(lease_id)
+
+            duration = time.time() - lease['issued_at']
+            worker['busy_time'] += duration
+            games = sum(stats.get(key, 0) for key in self.stats)
+            self._track_failures(worker_id, worker, games)
+            if task['done']:
+                # The other copy of a backed-up task got here first
+                self.metrics['duplicate_reports'] += 1
+                return False
+
+            shortfall = task['games'] - games
+            if shortfall > 0 and task['leases']:
+                # Another copy is still playing this task; let it finish instead
+                print(f"Dropping short report ({games}/{task['games']} games) for lease {lease_id} "
+                      f"from worker {worker_id}, another lease is still running")
+                self.metrics['short_reports_dropped'] += 1
+                return False
+
+            task['done'] = True
+            for key in self.stats:
+                self.stats[key] += stats.get(key, 0)
+            worker['games'] += games
+            worker['leases'] += 1
+            print(f"Worker {worker_id} finished lease {lease_id}: {stats}")
+
+            if shortfall > 0:
+                print(f"Requeueing {shortfall} games the lease did not play")
+                self._add_task(shortfall, urgent=True)
+                self.metrics['games_requeued'] += shortfall
+            if games > 0:
+                self.lease_durations.append(duration / games)
+            return True
+
+    def status(self):
+        """Snapshot of scheduling metrics."""
+        with self.lock:
+            elapsed = time.time() - self.start_time
+            games = sum(self.stats.values())
+            durations = sorted(self.lease_durations)
+            return {
+                'elapsed': elapsed,
+                'games': games,
+                'games_per_minute': games * 60 / elapsed if elapsed > 0 else 0.0,
+                'tasks_done': sum(1 for task in self.tasks.values() if task['done']),
+                'tasks_total': len(self.tasks),
+                'leases_running': len(self.leases),
+                'seconds_per_game_median': statistics.median(durations) if durations else 0.0,
+                'seconds_per_game_max': durations[-1] if durations else 0.0,
+                'stats': dict(self.stats),
+                'metrics': dict(self.metrics),
+                'workers': {worker_id: dict(worker) for worker_id, worker in self.workers.items()},
+            }
+
+    def print_status(self):
+        """Print scheduling metrics."""
+        status = self.status()
+        print(f"\nGames: {status['games']} in {status['elapsed']:.1f} seconds "
+              f"({status['games_per_minute']:.1f} games per minute)")
+        print(f"Tasks: {status['tasks_done']}/{status['tasks_total']} done, {status['leases_running']} leases running")
+        print(f"Seconds per game - median: {status['seconds_per_game_median']:.1f}, "
+              f"slowest lease: {status['seconds_per_game_max']:.1f}")
+        print(f"Scheduling - {', '.join(f'{key}: {value}' for key, value in status['metrics'].items())}")
+        for worker_id, worker in status['workers'].items():
+            print(f"Worker {worker_id} - Games: {worker['games']}, Leases: {worker['leases']}, "
+                  f"Busy: {worker['busy_time']:.1f}s{' (retired)' if worker['retired'] else ''}")
+        stats = status['stats']
+        print(f"Stats - Wins: {stats['wins']}, Losses: {stats['losses']}, Ties: {stats['ties']}")
+
+    def serve(self, host="0.0.0.0", port=8000, status_interval=30, linger=5):
+        """Serve workers until every task has been reported."""
+        server = SimpleXMLRPCServer((host, port), allow_none=True, logRequests=False)
+        server.register_function(self.request_work, 'request_work')
+        server.register_function(self.heartbeat, 'heartbeat')
+        server.register_function(self.report_result, 'report_result')
+        server.register_function(self.status, 'status')
+        server.timeout = 1
+
+        print(f"Coordinator listening on {host}:{port} with {len(self.tasks)} tasks")
+        last_status = time.time()
+        warned_retired = False
+        try:
+            while not self.is_done():
+                if not warned_retired and self.all_workers_retired():
+                    # New workers may still join, so keep serving
+                    print("\nEvery worker has been retired; waiting for new workers to finish the games")
+                    warned_retired = True
+                server.handle_request()
+                if time.time() - last_status >= status_interval:
+                    self.print_status()
+                    last_status = time.time()
+            # Keep answering for a moment so idle workers learn they are done
+            stop_time = time.time() + linger
+            while time.time() < stop_time:
+                server.handle_request()
+        finally:
+            server.server_close()
+
+        print("\nAll tasks finished.")
+        self.print_status()
+
+
+class GameWorker:
+    """Play leased game quotas with a TicTacToeBot and report them back."""
+    def __init__(self, coordinator_url, worker_id=None, remote_url=None, game_url=None,
+                 heartbeat_interval=10, poll_interval=2):
+        self.coordinator = xmlrpc.client.ServerProxy(coordinator_url, allow_none=True)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.remote_url = remote_url
+        self.game_url = game_url
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.bot = None
+
+    def play_lease(self, lease_id, games):
+        """Play one lease, sending heartbeats between game steps."""
+        self.bot.stats = {'wins': 0, 'losses': 0, 'ties': 0}
+        last_heartbeat = time.time()
+        for delay in self.bot.multiple_games_steps(games):
+            if time.time() - last_heartbeat >= self.heartbeat_interval:
+                if not self.coordinator.heartbeat(self.worker_id, lease_id):
+                    print(f"Lease {lease_id} was taken back by the coordinator, abandoning it")
+                    return None
+                last_heartbeat = time.time()
+            time.sleep(delay)
+        return self.bot.stats
+
+    def run(self):
+        """Ask for work until the coordinator has none left."""
+        print(f"Worker {self.worker_id} starting...")
+        # Imported here so the coordinator runs without selenium installed
+        from tictactoe_bot import GAME_URL, TicTacToeBot
+        self.bot = TicTacToeBot(remote_url=self.remote_url, game_url=self.game_url or GAME_URL)
+        try:
+            while True:
+                work = self.coordinator.request_work(self.worker_id)
+                if work.get('retired'):
+                    print("Coordinator retired this worker after leases with no games")
+                    break
+                if work.get('done'):
+                    print("Coordinator has no more work")
+                    break
+                if not work:
+                    time.sleep(self.poll_interval)
+                    continue
+
+                print(f"\nLease {work['lease_id']}: {work['games']} games")
+                stats = self.play_lease(work['lease_id'], work['games'])
+                if stats is not None:
+                    self.coordinator.report_result(self.worker_id, work['lease_id'], stats)
+        except (ConnectionError, xmlrpc.client.Fault) as e:
+            print(f"Lost contact with coordinator: {str(e)}")
+        finally:
+            try:
+                self.bot.driver.quit()
+            except:
+                pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed Tic-tac-toe bot runner")
+    subparsers = parser.add_subparsers(dest="role", required=True)
+
+    coordinator_parser = subparsers.add_parser("coordinator", help="Hand out games and collect results")
+    coordinator_parser.add_argument("--games", type=int, default=100, help="Total number of games to play")
+    coordinator_parser.add_argument("--games-per-task", type=positive_int, default=5, help="Games leased to a worker at a time")
+    coordinator_parser.add_argument("--host", default="0.0.0.0")
+    coordinator_parser.add_argument("--port", type=int, default=8000)
+    coordinator_parser.add_argument("--lease-timeout", type=float, default=60,
+                                    help="Seconds without a heartbeat before a lease is reassigned")
+    coordinator_parser.add_argument("--straggler-factor", type=float, default=2.0,
+                                    help="Back up leases running this many times slower than the median")
+    coordinator_parser.add_argument("--max-failed-leases", type=positive_int, default=3,
+                                    help="Retire a worker after this many leases in a row with no games")
+
+    worker_parser = subparsers.add_parser("worker", help="Play games leased by a coordinator")
+    worker_parser.add_argument("--coordinator", default="http://localhost:8000", help="Coordinator URL")
+    worker_parser.add_argument("--id", help="Worker name (defaults to host-pid)")
+    worker_parser.add_argument("--url", help="Game page to play on (defaults to playtictactoe.org)")
+    worker_parser.add_argument("--remote-url", help="Remote WebDriver endpoint, e.g. http://localhost:9515")
+
+    args = parser.parse_args()
+    if args.role == "coordinator":
+        coordinator = GameCoordinator(args.games, args.games_per_task, args.lease_timeout, args.straggler_factor,
+                                      args.max_failed_leases)
+        try:
+            coordinator.serve(args.host, args.port)
+        except KeyboardInterrupt:
+            print("\nCoordinator stopped by user")
+            coordinator.print_status()
+    else:
+        GameWorker(args.coordinator, args.id, args.remote_url, args.url).run()
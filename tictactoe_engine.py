@@ -0,0 +1,69 @@
+"""Minimax engine for tic-tac-toe, independent of the browser.
+
+Boards are tuples of nine cells in row-major order, each 'X', 'O' or ''.
+Results are memoized per position: there are only a few thousand reachable
+boards, so after the first search every decision is a cache lookup.
+"""
+from functools import lru_cache
+
+LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # Rows
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # Columns
+    (0, 4, 8), (2, 4, 6),             # Diagonals
+)
+
+
+def other_player(player):
+    """Return the opposing mark."""
+    return 'O' if player == 'X' else 'X'
+
+
+def flatten(board):
+    """Turn a 3x3 list-of-lists board into the engine's tuple form."""
+    return tuple(cell for row in board for cell in row)
+
+
+@lru_cache(maxsize=None)
+def check_winner(board):
+    """Return 'X' or 'O' for a win, 'tie' for a full board, otherwise None."""
+    for a, b, c in LINES:
+        if board[a] != '' and board[a] == board[b] == board[c]:
+            return board[a]
+    if '' not in board:
+        return 'tie'
+    return None
+
+
+@lru_cache(maxsize=None)
+def minimax(board, to_move, player):
+    """Score the board for player with to_move next: 1 win, 0 tie, -1 loss."""
+    result = check_winner(board)
+    if result is not None:
+        if result == 'tie':
+            return 0
+        return 1 if result == player else -1
+
+    scores = []
+    for index in range(9):
+        if board[index] == '':
+            child = board[:index] + (to_move,) + board[index + 1:]
+            scores.append(minimax(child, other_player(to_move), player))
+    return max(scores) if to_move == player else min(scores)
+
+
+@lru_cache(maxsize=None)
+def best_move(board, player):
+    """Return the index of the best move for player, or None if the game is over."""
+    if check_winner(board) is not None:
+        return None
+
+    best_score = None
+    best_index = None
+    for index in range(9):
+        if board[index] == '':
+            child = board[:index] + (player,) + board[index + 1:]
+            score = minimax(child, other_player(player), player)
+            if best_score is None or score > best_score:
+                best_score = score
+                best_index = index
+    return best_index
@@ -0,0 +1,185 @@
+"""Profile a bot session and split its wall time by where it went.
+
+SessionProfiler times three categories by wrapping the functions that enter
+them for the duration of the session:
+
+* engine    - move calculation (the functions passed in as engine targets)
+* webdriver - every WebDriver command and WebDriverWait poll
+* sleep     - deliberate time.sleep calls
+
+Time is charged to the outermost category only, so a sleep inside a
+WebDriverWait counts as WebDriver time. Whatever is left is "other".
+
+Alongside the timers, a background thread samples the session's stack and
+roots each sample at its category. Samples taken while blocked in a sleep or
+a WebDriver call also end in that category, so the wait is not charged as
+self time to whichever Python function made the call. The samples are written
+in collapsed-stack format ("[category];frame;frame count"), which
+flamegraph.pl, speedscope and similar tools read directly. In deterministic mode the session also runs
+under cProfile and the report includes its per-function listing.
+"""
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.wait import WebDriverWait
+from collections import Counter
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+
+CATEGORIES = ('engine', 'webdriver', 'sleep')
+BLOCKING_CATEGORIES = ('webdriver', 'sleep')  # Mostly time spent waiting outside Python
+
+
+class SessionProfiler:
+    """Context manager that profiles everything run inside it on this thread."""
+    def __init__(self, output_dir, engine_targets=(), deterministic=True, sample_interval=0.005, top=30):
+        self.output_dir = output_dir
+        self.targets = {
+            'engine': list(engine_targets),
+            'webdriver': [(WebDriver, 'execute'), (WebDriverWait, 'until'), (WebDriverWait, 'until_not')],
+            'sleep': [(time, 'sleep')],
+        }
+        self.deterministic = deterministic
+        self.sample_interval = sample_interval
+        self.top = top
+
+        self.totals = {category: 0.0 for category in CATEGORIES}
+        self.current_category = None
+        self.samples = Counter()
+        self.thread_id = None
+        self.patched = []
+        self.cprofile = None
+        self.sampler = None
+        self.stop_sampling = threading.Event()
+        self.start_time = None
+        self.wall_time = 0.0
+
+    def _timed(self, category, func):
+        """Wrap func so the time spent in it is charged to category."""
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if profiler.current_category is not None or threading.get_ident() != profiler.thread_id:
+                return func(*args, **kwargs)
+            profiler.current_category = category
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.totals[category] += time.perf_counter() - start
+                profiler.current_category = None
+        return wrapper
+
+    def _sample(self):
+        """Record the profiled thread's stack every sample_interval seconds."""
+        # Event.wait rather than time.sleep, which is patched while we run
+        while not self.stop_sampling.wait(self.sample_interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename != __file__:  # Hide our own wrappers
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if not stack:
+                continue
+            # Root each stack at its category so the flamegraph splits by it first
+            category = self.current_category or 'other'
+            stack.append(f"[{category}]")
+            stack.reverse()
+            if category in BLOCKING_CATEGORIES:
+                stack.append(f"[{category}]")
+            self.samples[';'.join(stack)] += 1
+
+    def __enter__(self):
+        self.thread_id = threading.get_ident()
+        for category, targets in self.targets.items():
+            for owner, name in targets:
+                original = getattr(owner, name)
+                self.patched.append((owner, name, original))
+                setattr(owner, name, self._timed(category, original))
+
+        self.sampler = threading.Thread(target=self._sample, daemon=True)
+        self.sampler.start()
+        if self.deterministic:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wall_time = time.perf_counter() - self.start_time
+        if self.cprofile:
+            self.cprofile.disable()
+        self.stop_sampling.set()
+        self.sampler.join()
+        for owner, name, original in reversed(self.patched):
+            setattr(owner, name, original)
+        self.patched = []
+
+        try:
+            self.write_reports()
+        except OSError as e:
+            print(f"Could not write profile: {str(e)}")
+        return False
+
+    def breakdown(self):
+        """Wall time per category, including the unaccounted remainder."""
+        times = dict(self.totals)
+        times['other'] = max(0.0, self.wall_time - sum(self.totals.values()))
+        return times
+
+    def hot_functions(self):
+        """Functions ranked by the share of samples they appear in."""
+        inclusive = Counter()
+        exclusive = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(';')
+            for frame in set(frames):
+                inclusive[frame] += count
+            exclusive[frames[-1]] += count
+        return inclusive, exclusive
+
+    def report(self):
+        """Build the text report."""
+        lines = [f"Session wall time: {self.wall_time:.2f}s", "", "Wall time by category:"]
+        for category, seconds in self.breakdown().items():
+            share = seconds * 100 / self.wall_time if self.wall_time else 0.0
+            lines.append(f"  {category:<10} {seconds:9.2f}s  {share:5.1f}%")
+
+        total_samples = max(sum(self.samples.values()), 1)
+        inclusive, exclusive = self.hot_functions()
+        lines += ["", f"Hottest functions ({total_samples} samples every {self.sample_interval * 1000:g}ms):",
+                  f"  {'total%':>7} {'self%':>7}  function"]
+        for frame, count in inclusive.most_common(self.top):
+            lines.append(f"  {count * 100 / total_samples:6.1f}% {exclusive[frame] * 100 / total_samples:6.1f}%  {frame}")
+
+        if self.cprofile:
+            stream = io.StringIO()
+            stats = pstats.Stats(self.cprofile, stream=stream)
+            stats.sort_stats('cumulative').print_stats(self.top)
+            lines += ["", "cProfile (deterministic, sorted by cumulative time):", stream.getvalue()]
+        return '\n'.join(lines).rstrip('\n') + '\n'
+
+    def write_reports(self):
+        """Write the report and flamegraph file for this session."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"session-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+
+        with open(base + ".txt", "w") as report_file:
+            report_file.write(self.report())
+        with open(base + ".folded", "w") as folded_file:
+            for stack, count in self.samples.items():
+                folded_file.write(f"{stack} {count}\n")
+        if self.cprofile:
+            self.cprofile.dump_stats(base + ".prof")
+
+        print("\nProfile breakdown:")
+        for category, seconds in self.breakdown().items():
+            print(f"  {category}: {seconds:.2f}s")
+        print(f"Profile written to {base}.txt (flamegraph stacks in {base}.folded)")
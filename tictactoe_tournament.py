@@ -0,0 +1,258 @@
+"""Headless self-play tournament to validate the engine.
+
+Plays the engine from both sides against:
+
+* itself
+* scripted opponents that take the first free cell from a fixed order
+* every possible opponent (all replies to the engine's moves, exhaustively)
+* a random opponent, for the bulk of the games, spread over a process pool
+
+The engine must never lose. The harness reports results per matchup, games
+per second and percentiles of the engine's per-move decision latency, and
+exits with status 1 if any game was lost.
+
+    python tictactoe_tournament.py --games 1000000
+"""
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+import argparse
+import os
+import random
+import sys
+import time
+
+import tictactoe_engine as engine
+
+SCRIPTS = {
+    'corners': (0, 2, 6, 8, 4, 1, 3, 5, 7),
+    'edges': (1, 3, 5, 7, 4, 0, 2, 6, 8),
+    'center-corners': (4, 0, 8, 2, 6, 1, 7, 3, 5),
+    'row-major': (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    'reverse': (8, 7, 6, 5, 4, 3, 2, 1, 0),
+}
+
+LATENCY_BUCKET_NS = 100  # Resolution of the latency histogram
+
+
+def engine_player(board, mark, rng):
+    return engine.best_move(board, mark)
+
+
+def random_player(board, mark, rng):
+    return rng.choice([index for index in range(9) if board[index] == ''])
+
+
+def scripted_player(order):
+    """Build a player that takes the first free cell in order."""
+    def play(board, mark, rng):
+        for index in order:
+            if board[index] == '':
+                return index
+    return play
+
+
+def empty_result():
+    return {'games': 0, 'wins': 0, 'losses': 0, 'ties': 0, 'lost_games': []}
+
+
+def record(result, winner, engine_mark, moves):
+    """Add a finished game to result, from the engine's point of view."""
+    result['games'] += 1
+    if winner == 'tie':
+        result['ties'] += 1
+    elif winner == engine_mark:
+        result['wins'] += 1
+    else:
+        result['losses'] += 1
+        if len(result['lost_games']) < 5:  # Keep a few for the report
+            result['lost_games'].append(moves)
+
+
+def play_game(x_player, o_player, engine_marks, rng, latencies):
+    """Play one game and return (winner, moves). Times moves by engine_marks."""
+    board = ('',) * 9
+    mark = 'X'
+    moves = []
+    while True:
+        player = x_player if mark == 'X' else o_player
+        if mark in engine_marks:
+            start = time.perf_counter_ns()
+            index = player(board, mark, rng)
+            latencies[(time.perf_counter_ns() - start) // LATENCY_BUCKET_NS] += 1
+        else:
+            index = player(board, mark, rng)
+
+        board = board[:index] + (mark,) + board[index + 1:]
+        moves.append(index)
+        winner = engine.check_winner(board)
+        if winner is not None:
+            return winner, moves
+        mark = engine.other_player(mark)
+
+
+def play_exhaustive(engine_mark, result, latencies, board=('',) * 9, mark='X', moves=()):
+    """Play the engine against every possible sequence of opponent moves."""
+    winner = engine.check_winner(board)
+    if winner is not None:
+        record(result, winner, engine_mark, list(moves))
+        return
+
+    if mark == engine_mark:
+        start = time.perf_counter_ns()
+        index = engine.best_move(board, mark)
+        latencies[(time.perf_counter_ns() - start) // LATENCY_BUCKET_NS] += 1
+        candidates = [index]
+    else:
+        candidates = [index for index in range(9) if board[index] == '']
+
+    for index in candidates:
+        child = board[:index] + (mark,) + board[index + 1:]
+        play_exhaustive(engine_mark, result, latencies, child, engine.other_player(mark), moves + (index,))
+
+
+def run_task(task):
+    """Run one batch of games in a worker process.
+
+    task is (opponent, engine_mark, games, seed). Returns the matchup result
+    and the engine's latency histogram.
+    """
+    opponent, engine_mark, games, seed = task
+    result = empty_result()
+    latencies = Counter()
+    rng = random.Random(seed)
+
+    if opponent == 'exhaustive':
+        play_exhaustive(engine_mark, result, latencies)
+        return task, result, latencies
+
+    if opponent == 'engine':
+        other = engine_player
+        engine_marks = ('X', 'O')
+    elif opponent == 'random':
+        other = random_player
+        engine_marks = (engine_mark,)
+    else:
+        other = scripted_player(SCRIPTS[opponent.split(':', 1)[1]])
+        engine_marks = (engine_mark,)
+
+    x_player, o_player = (engine_player, other) if engine_mark == 'X' else (other, engine_player)
+    for _ in range(games):
+        winner, moves = play_game(x_player, o_player, engine_marks, rng, latencies)
+        if opponent == 'engine' and winner != 'tie':
+            winner = engine.other_player(engine_mark)  # Whichever side lost, the engine lost
+        record(result, winner, engine_mark, moves)
+    return task, result, latencies
+
+
+def build_tasks(random_games, chunk_size, seed):
+    """Split the tournament into batches for the process pool."""
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    # The engine is deterministic, so one self-play game covers both sides
+    tasks = [('engine', 'X', 1, seed)]
+    for engine_mark in ('X', 'O'):
+        tasks.append(('exhaustive', engine_mark, 0, seed))
+        for name in SCRIPTS:
+            tasks.append((f'script:{name}', engine_mark, 1, seed))
+
+    # Split the random games evenly between the sides, then chunk each half
+    chunk = 0
+    for engine_mark, remaining in (('X', (random_games + 1) // 2), ('O', random_games // 2)):
+        while remaining > 0:
+            games = min(chunk_size, remaining)
+            tasks.append(('random', engine_mark, games, seed + chunk))
+            remaining -= games
+            chunk += 1
+    return tasks
+
+
+def percentile(histogram, fraction):
+    """Return the latency in nanoseconds at the given fraction of the histogram."""
+    total = sum(histogram.values())
+    threshold = fraction * total
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= threshold:
+            return bucket * LATENCY_BUCKET_NS
+    return 0
+
+
+def cold_search_time():
+    """Time a first decision on the empty board with empty caches."""
+    for cached in (engine.best_move, engine.minimax, engine.check_winner):
+        cached.cache_clear()
+    start = time.perf_counter()
+    engine.best_move(('',) * 9, 'X')
+    return time.perf_counter() - start
+
+
+def run_tournament(random_games=1000000, workers=None, chunk_size=20000, seed=0):
+    """Run every matchup and return (results by matchup, latency histogram, elapsed)."""
+    tasks = build_tasks(random_games, chunk_size, seed)
+    results = {}
+    latencies = Counter()
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (opponent, engine_mark, _, _), result, task_latencies in pool.map(run_task, tasks):
+            matchup = results.setdefault((opponent, engine_mark), empty_result())
+            for key in ('games', 'wins', 'losses', 'ties'):
+                matchup[key] += result[key]
+            matchup['lost_games'].extend(result['lost_games'])
+            latencies.update(task_latencies)
+    elapsed = time.perf_counter() - start
+    return results, latencies, elapsed
+
+
+def matchup_name(opponent, engine_mark):
+    """Describe a matchup for the report."""
+    if opponent == 'engine':
+        return "engine vs engine"
+    return f"engine as {engine_mark} vs {opponent}"
+
+
+def print_report(results, latencies, elapsed, cold_time):
+    """Print results per matchup, throughput and decision latency."""
+    print(f"{'Matchup':<40} {'Games':>10} {'Wins':>10} {'Losses':>8} {'Ties':>10}")
+    for (opponent, engine_mark), result in sorted(results.items()):
+        name = matchup_name(opponent, engine_mark)
+        print(f"{name:<40} {result['games']:>10} {result['wins']:>10} {result['losses']:>8} {result['ties']:>10}")
+
+    games = sum(result['games'] for result in results.values())
+    decisions = sum(latencies.values())
+    print(f"\nPlayed {games} games in {elapsed:.2f} seconds ({games / elapsed:.0f} games/sec)")
+    print(f"Engine decisions: {decisions}")
+    print("Decision latency - " + ", ".join(
+        f"{label}: {percentile(latencies, fraction) / 1000:.1f}us"
+        for label, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('p99.9', 0.999), ('max', 1.0))))
+    print(f"Cold search of the empty board: {cold_time * 1000:.1f}ms")
+
+
+def positive_int(value):
+    """argparse type for integers of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate the Tic-tac-toe engine with a self-play tournament")
+    parser.add_argument("--games", type=int, default=1000000, help="Number of games against the random opponent")
+    parser.add_argument("--workers", type=positive_int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--chunk-size", type=positive_int, default=20000, help="Games per worker task")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random opponent")
+    args = parser.parse_args()
+
+    cold_time = cold_search_time()
+    results, latencies, elapsed = run_tournament(args.games, args.workers, args.chunk_size, args.seed)
+    print_report(results, latencies, elapsed, cold_time)
+
+    lost = {matchup: result for matchup, result in results.items() if result['losses']}
+    if lost:
+        print("\nFAILED: the engine lost games")
+        for (opponent, engine_mark), result in lost.items():
+            print(f"{matchup_name(opponent, engine_mark)}: {result['losses']} losses, e.g. moves {result['lost_games'][0]}")
+        sys.exit(1)
+    print("\nPASSED: the engine never lost")